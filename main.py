@@ -1,15 +1,21 @@
-from typing import List
+from typing import List, Tuple
 from time import sleep
 from enum import Enum, auto
 import random
+import sys
 
-from soupsieve import select
 import config
 
 # Block representations
 MINE = '#'
 NO_SURROUNDING_MINES = '·'
 UNKNOWN_BLOCK = ' '
+# every possible surrounding-mines count, so no str() call per block
+NEAR_BOMBS_REPRS = (NO_SURROUNDING_MINES, '1', '2', '3', '4', '5', '6', '7', '8')
+
+# Block flags, packed together in one byte per block
+MINE_FLAG = 1
+VISIBLE_FLAG = 2
 
 
 class MoveResult(Enum):
@@ -17,42 +23,11 @@ class MoveResult(Enum):
     ALL_OK = auto()
 
 
-class BlockType(Enum):
-    MINE = auto()
-    NORMAL = auto()
-
-
-class BlockVisibility:
-    VISIBLE = auto()
-    INVISIBLE = auto()
-
-
 class Position:
     def __init__(self, move: str):
-        self.x, self.y = tuple(
-            map(lambda x: int(x), move.split(' '))
-        )
-
-
-class Block:
-    def __init__(self, type_: BlockType):
-        self.type_ = type_
-        self.visibility = BlockVisibility.INVISIBLE
-
-    def is_mine(self) -> bool:
-        return self.type_ == BlockType.MINE
-
-    def is_normal(self) -> bool:
-        return self.type_ == BlockType.NORMAL
-
-    def is_visible(self) -> bool:
-        return self.visibility == BlockVisibility.VISIBLE
-
-    def is_invisible(self) -> bool:
-        return self.visibility == BlockVisibility.INVISIBLE
-
-    def make_visible(self) -> None:
-        self.visibility = BlockVisibility.VISIBLE
+        x, y = move.split(' ', 1)
+        self.x = int(x)
+        self.y = int(y)
 
 
 class Board:
@@ -61,36 +36,117 @@ class Board:
         self.height = board_height - 1
         self.number_of_mines = number_of_mines
         self.unseen_blocks = (board_width * board_height) - number_of_mines
-        self.board = self.make_board(
+        self._cells = self.make_board(
             board_width, board_height, number_of_mines
         )
+        # the mine layout never changes, so the surrounding-mines count of
+        # every block is computed once here instead of on every lookup
+        self._near = self._build_near_table()
+        self._components, self._component_cells = self._label_components()
+        # static pieces of the printed frame, they only depend on the
+        # board dimensions so they are built once here
+        self._top_border = '      ' + ' _____' * board_width + ' \n'
+        self._row_top = '      ' + '|     ' * board_width + '|\n'
+        self._row_bottom = '      ' + '|_____' * board_width + '|\n'
+        self._row_labels = [f'   {y}  ' for y in range(board_height)]
+        self._column_labels = '      ' + ''.join(
+            f'   {x}  ' for x in range(board_width)
+        ) + '\n'
 
     @staticmethod
-    def make_board(board_width: int, board_height: int, number_of_mines: int) -> List[List[Block]]:
+    def make_board(board_width: int, board_height: int, number_of_mines: int) -> bytearray:
         """
-        Returns a board in the form of a list with the size of the board.
-        Each element of the board is a Block instance.
+        Returns the board as a single flat bytearray with one byte per
+        block, holding the MINE_FLAG and VISIBLE_FLAG bits. The whole
+        board fits in a couple of cache lines and checking a block is a
+        plain index plus a bit test.
         Mines are randomly placed after creating the board with the given
         proportions.
         """
-        # Creating board with no bombs
-        board = [[Block(BlockType.NORMAL) for _ in range(board_width)]
-                 for _ in range(board_height)]
-
-        # Placing bombs
-        n = 0
-        while n < number_of_mines:
-            mine_x_location = random.randint(0, board_width - 1)
-            mine_y_location = random.randint(0, board_height - 1)
-
-            # block is already a mine
-            if board[mine_y_location][mine_x_location].is_mine():
-                continue
+        # Creating the board with no bombs and every block hidden
+        cells = bytearray(board_width * board_height)
+
+        # Placing bombs; sampling the indexes directly avoids retrying
+        # on collisions, which gets expensive on dense boards
+        for index in random.sample(range(board_width * board_height), number_of_mines):
+            cells[index] |= MINE_FLAG
+
+        return cells
 
-            board[mine_y_location][mine_x_location] = Block(BlockType.MINE)
-            n += 1
+    def _label_components(self) -> Tuple[List[List[int]], dict]:
+        """
+        Labels the connected regions of blocks with no surrounding mines.
+        Revealing any block of a region uncovers the whole region plus its
+        numbered border, so the regions are computed once here and the
+        reveal becomes a lookup instead of a board exploration per move.
+        Returns the per-block region labels (0 meaning no region) and a
+        mapping from label to the blocks revealed with that region.
+        """
+
+        width = self.width + 1
+        height = self.height + 1
+        board_cells = self._cells
+        near = self._near
+
+        # blocks with no mine and no surrounding mines
+        zero = [bytearray(width) for _ in range(height)]
+        for y in range(height):
+            for x in range(width):
+                if not board_cells[y * width + x] & MINE_FLAG and near[y][x] == 0:
+                    zero[y][x] = 1
+
+        components = [[0] * width for _ in range(height)]
+        component_cells = {}
+        label = 0
+
+        for start_y in range(height):
+            for start_x in range(width):
+                if not zero[start_y][start_x] or components[start_y][start_x]:
+                    continue
+
+                label += 1
+                components[start_y][start_x] = label
+                stack = [(start_x, start_y)]
+                cells = []
+                component_cells[label] = cells
+
+                while stack:
+                    x, y = stack.pop()
+                    cells.append((x, y))
+
+                    for near_y in range(y - 1, y + 2):
+                        for near_x in range(x - 1, x + 2):
+                            if not (0 <= near_y < height and 0 <= near_x < width):
+                                continue
+
+                            if zero[near_y][near_x]:
+                                if not components[near_y][near_x]:
+                                    components[near_y][near_x] = label
+                                    stack.append((near_x, near_y))
+                            else:
+                                # numbered border block; it may get appended
+                                # more than once, the reveal skips duplicates
+                                cells.append((near_x, near_y))
+
+        return components, component_cells
+
+    def reveal_region(self, x: int, y: int) -> int:
+        """
+        Reveals the whole region of blocks with no surrounding mines the
+        coordinates belong to, plus its numbered border.
+        Returns the number of newly revealed blocks.
+        """
+
+        revealed = 0
+        cells = self._cells
+        width = self.width + 1
+        for x, y in self._component_cells[self._components[y][x]]:
+            index = y * width + x
+            if not cells[index] & VISIBLE_FLAG:
+                cells[index] |= VISIBLE_FLAG
+                revealed += 1
 
-        return board
+        return revealed
 
     def is_in_valid_height_range(self, num: int) -> bool:
         return 0 <= num <= self.height
@@ -98,96 +154,100 @@ class Board:
     def is_in_valid_width_range(self, num: int) -> bool:
         return 0 <= num <= self.width
 
-    def get_block(self, position: Position) -> Block:
-        return self.board[position.y][position.x]
+    def _index(self, x: int, y: int) -> int:
+        return y * (self.width + 1) + x
 
-    def get_block_near_bombs(self, position: Position) -> int:
+    def is_mine(self, x: int, y: int) -> bool:
+        return bool(self._cells[self._index(x, y)] & MINE_FLAG)
+
+    def is_visible(self, x: int, y: int) -> bool:
+        return bool(self._cells[self._index(x, y)] & VISIBLE_FLAG)
+
+    def make_visible(self, x: int, y: int) -> None:
+        self._cells[self._index(x, y)] |= VISIBLE_FLAG
+
+    def get_block_near_bombs(self, x: int, y: int) -> int:
         """Get a block near bombs"""
 
-        num_of_near_bombs = 0
-        for y in range(position.y - 1, position.y + 2):
-            for x in range(position.x - 1, position.x + 2):
-                # checking if x and y are valid values
-                if (not self.is_in_valid_height_range(y)) or (not self.is_in_valid_width_range(x)):
-                    continue
+        return self._near[y][x]
+
+    def _build_near_table(self) -> List[bytearray]:
+        """
+        Builds the surrounding-mines count of every block in a single pass
+        over the board: each mine bumps the count of the blocks around it,
+        instead of every block scanning its nine surroundings.
+        """
+
+        width = self.width + 1
+        height = self.height + 1
+        cells = self._cells
 
-                if self.board[y][x].is_mine():
-                    num_of_near_bombs += 1
+        near = [bytearray(width) for _ in range(height)]
+        for index in range(width * height):
+            if not cells[index] & MINE_FLAG:
+                continue
 
-        return num_of_near_bombs
+            y, x = divmod(index, width)
+            # clamping the bumped window to the board keeps the inner
+            # loop free of range checks
+            for near_y in range(max(y - 1, 0), min(y + 2, height)):
+                row = near[near_y]
+                for near_x in range(max(x - 1, 0), min(x + 2, width)):
+                    row[near_x] += 1
 
-    def get_block_true_repr(self, position: Position):
-        """Returns the block true representation"""
+        return near
 
-        block = self.get_block(position)
+    def get_block_true_repr(self, x: int, y: int):
+        """Returns the block true representation"""
 
-        if block.is_mine():
+        if self._cells[self._index(x, y)] & MINE_FLAG:
             return MINE
 
-        near_bombs = self.get_block_near_bombs(position)
-        if near_bombs == 0:
-            return NO_SURROUNDING_MINES
-
-        return str(near_bombs)
+        return NEAR_BOMBS_REPRS[self.get_block_near_bombs(x, y)]
 
-    def get_block_repr(self, position: Position, get_true_representation=False) -> str:
+    def get_block_repr(self, x: int, y: int, get_true_representation=False) -> str:
         """Returns the block representation"""
 
-        block = self.get_block(position)
+        cell = self._cells[self._index(x, y)]
 
-        if block.is_invisible():
+        if not cell & VISIBLE_FLAG:
             return UNKNOWN_BLOCK
 
-        if block.is_mine():
+        if cell & MINE_FLAG:
             return MINE
 
-        block_near_bombs = self.get_block_near_bombs(position)
-
-        if not block_near_bombs:
-            return NO_SURROUNDING_MINES
-
-        return str(block_near_bombs)
+        return NEAR_BOMBS_REPRS[self.get_block_near_bombs(x, y)]
 
     def print_board(self, game_finished=False) -> None:
-        """Prints the board to the console."""
+        """Prints the board to the console.
+
+        The whole frame is built as one string and written in a single
+        call, instead of one print call per board piece.
+        """
 
         height = self.height + 1
         width = self.width + 1
 
-        def draw_line(line: str, repetitions: int) -> None:
-            """Draws a line of the board."""
-
-            print('      ', end='')
-
-            for _ in range(repetitions - 1):
-                print(line, end='')
+        # hoisted out of the loop: one bound method and one branch less
+        # per block
+        get_repr = self.get_block_true_repr if game_finished else self.get_block_repr
 
-            print(line + line[0])
-
-        draw_line(' _____', width)
+        out = [self._top_border]
 
         for y in range(height):
-            draw_line('|     ', width)
+            out.append(self._row_top)
 
-            print(f'   {y}  ', end='')
+            out.append(self._row_labels[y])
             for x in range(width):
-                position = Position(f'{x} {y}')
-                if not game_finished:
-                    block_repr = self.get_block_repr(position)
-                else:
-                    block_repr = self.get_block_true_repr(position)
-
-                print(f'|  {block_repr}  ', end='')
+                out.append(f'|  {get_repr(x, y)}  ')
 
-            print('|')
+            out.append('|\n')
 
-            draw_line('|_____', width)
+            out.append(self._row_bottom)
 
-        print('      ', end='')
-        for x in range(width):
-            print(f'   {x}  ', end='')
+        out.append(self._column_labels)
 
-        print()
+        sys.stdout.write(''.join(out))
 
 
 class GameDriver:
@@ -220,7 +280,7 @@ class GameDriver:
             return False
 
         # checking if the block is already seen
-        return self.game_board.board[y][x].is_invisible()
+        return not self.game_board.is_visible(x, y)
 
     def request_move(self) -> Position:
         """
@@ -231,7 +291,18 @@ class GameDriver:
         """
 
         while True:
-            move = input('\nMake your move -> ')
+            # a plain readline instead of input(), so piped move batches
+            # don't pay the interactive prompt machinery per move
+            sys.stdout.write('\nMake your move -> ')
+            sys.stdout.flush()
+            move = sys.stdin.readline()
+
+            # the input ended, same as quitting
+            if not move:
+                print('\nEnding game ... :(\n')
+                exit(0)
+
+            move = move.rstrip('\n')
 
             if move == 'h':
                 print('A valid move would look like this:\n4 5\n'
@@ -256,26 +327,22 @@ class GameDriver:
         If the player found a mine the function will return MoveResult.FOUND_MINE otherwise MoveResult.ALL_OK
         """
 
-        self.game_board.board[move.y][move.x].make_visible()
-        self.unseen_blocks -= 1
-        if self.game_board.get_block(move).is_mine():
+        board = self.game_board
+
+        # mines are not part of the unseen-blocks count
+        if board.is_mine(move.x, move.y):
+            board.make_visible(move.x, move.y)
             return MoveResult.FOUND_MINE
 
         # the block has bombs near
-        if self.game_board.get_block_near_bombs(move) > 0:
+        if board.get_block_near_bombs(move.x, move.y) > 0:
+            board.make_visible(move.x, move.y)
+            self.unseen_blocks -= 1
             return MoveResult.ALL_OK
 
-        # if the block has no bombs near, the function will recursively explore
-        # the surrounding blocks and reveal them
-        for y in range(move.y - 1, move.y + 2):
-            for x in range(move.x - 1, move.x + 2):
-                # checking if x and y are valid values
-                if (not self.game_board.is_in_valid_height_range(y)) or (not self.game_board.is_in_valid_width_range(x)):
-                    continue
-
-                # is another normal block
-                if self.game_board.board[y][x].is_invisible():
-                    self.do_move(Position(f'{x} {y}'))
+        # the block has no bombs near; its whole region was labeled when the
+        # board was built, so the reveal is a single sweep over that region
+        self.unseen_blocks -= board.reveal_region(move.x, move.y)
 
         return MoveResult.ALL_OK
 
@@ -295,14 +362,12 @@ class GameDriver:
             move = self.request_move()
             result = self.do_move(move)
 
-            if result == MoveResult.FOUND_MINE:
-                self.game_board.print_board(game_finished=True)
-                print('\nGame over... :(\n')
-                break
-
-            if self.is_game_over():
-                print('\nCongrats! You finished the game :)')
+            found_mine = result is MoveResult.FOUND_MINE
+            if found_mine or self.is_game_over():
+                # a single final draw, whatever way the game ended
                 self.game_board.print_board(game_finished=True)
+                print('\nGame over... :(\n' if found_mine
+                      else '\nCongrats! You finished the game :)')
                 break
 
 